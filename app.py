@@ -1,15 +1,34 @@
 import os
-from flask import Flask, render_template, redirect, url_for, flash, request
+import json
+import base64
+import tempfile
+from flask import (Flask, render_template, redirect, url_for, flash, request, abort, Response,
+                   stream_with_context, send_from_directory, send_file, jsonify, make_response)
+from markupsafe import Markup
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
 from datetime import datetime, timedelta
-from collections import Counter
+import click
+from sqlalchemy import func, case, and_, or_, inspect, text
+from sqlalchemy.orm import joinedload
 
 from config import Config
 from models import db, User, Hoarding
-from forms import LoginForm, HoardingForm
+from forms import LoginForm, HoardingForm, ImportForm
+from images import submit_derivatives, apply_derivatives
+from database import sqlite_engine_options, configure_sqlite, use_immediate_transactions, run_stress
+from instrumentation import init_instrumentation
+from caching import (create_version_triggers, data_version, page_etag, not_modified,
+                     set_revalidate, FragmentCache)
+from compression import init_compression
+from search import create_search_index, rebuild_search_index, search_hoardings
+from geo import (create_spatial_index, rebuild_spatial_index, backfill_coordinates,
+                 hoardings_in_bbox, hoardings_within, nearest_hoardings)
+from bulk import read_rows, import_rows, iter_csv, write_xlsx, ImportFormatError
+from seed import seed_database
+from storage import (stage_upload, store_upload, discard_upload, release, is_content_addressed,
+                     migrate_legacy_uploads)
 
 # ✅ Detect if running locally (for static path logic)
 IS_LOCAL = os.environ.get('FLASK_ENV') == 'development'
@@ -20,7 +39,11 @@ app = Flask(__name__,
             static_folder='static')
 
 app.config.from_object(Config)
+sqlite_engine_options(app)
 db.init_app(app)
+configure_sqlite(app)
+init_instrumentation(app)
+init_compression(app)
 
 # ✅ Login manager
 login_manager = LoginManager(app)
@@ -30,10 +53,220 @@ login_manager.login_view = 'hoarding_login'
 def load_user(user_id):
     return User.query.get(int(user_id))
 
+# ✅ Static URLs follow the local / reverse-proxy static path
+@app.context_processor
+def static_helpers():
+    return {'url_for_static': lambda filename: url_for('static', filename=filename),
+            'url_for_upload': lambda filename: url_for('hoarding_media', filename=filename)}
+
 # ✅ Allowed image file types
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
+# ✅ Dashboard facets: one grouped aggregate, cached until the data version moves
+_facet_cache = {}
+fragment_cache = FragmentCache(Config.FRAGMENT_CACHE_MAX_BYTES)
+
+def get_dashboard_facets(version):
+    today = datetime.now().date()
+    cached = _facet_cache.get('facets')
+    if cached and version is not None and (cached['date'], cached['version']) == (today, version):
+        return cached
+
+    upcoming = today + timedelta(days=30)
+    rows = db.session.query(
+        Hoarding.showroom_name,
+        Hoarding.place,
+        func.count(Hoarding.id),
+        func.sum(case((Hoarding.renewal_date <= upcoming, 1), else_=0))
+    ).group_by(Hoarding.showroom_name, Hoarding.place).all()
+
+    places, chart_data = set(), {}
+    total_hoardings = upcoming_renewals = 0
+    for showroom, place, count, due in rows:
+        if place is not None:
+            places.add(place)
+        if showroom is not None:
+            chart_data[showroom] = chart_data.get(showroom, 0) + count
+        total_hoardings += count
+        upcoming_renewals += due or 0
+
+    showrooms = sorted(chart_data)
+    facets = {
+        'date': today,
+        'version': version,
+        'upcoming': upcoming,
+        'places': sorted(places),
+        'showrooms': showrooms,
+        'labels': showrooms,
+        'values': [chart_data[s] for s in showrooms],
+        'total_hoardings': total_hoardings,
+        'upcoming_renewals': upcoming_renewals,
+    }
+    _facet_cache['facets'] = facets
+    return facets
+
+# ✅ Keyset pagination over (renewal_date, id)
+def filtered_hoardings(place_filter, showroom_filter):
+    query = Hoarding.query.options(joinedload(Hoarding.user))
+    if place_filter:
+        query = query.filter(Hoarding.place == place_filter)
+    if showroom_filter:
+        query = query.filter(Hoarding.showroom_name == showroom_filter)
+    return query.order_by(Hoarding.renewal_date, Hoarding.id)
+
+def encode_cursor(h):
+    key = [h.renewal_date.isoformat() if h.renewal_date else None, h.id]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip('=')
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        renewal_date, last_id = json.loads(base64.urlsafe_b64decode(padded))
+        if renewal_date is not None:
+            renewal_date = datetime.strptime(renewal_date, '%Y-%m-%d').date()
+        return renewal_date, int(last_id)
+    except (ValueError, TypeError):
+        return None
+
+def seek_after(query, cursor):
+    renewal_date, last_id = cursor
+    # SQLite sorts NULL dates first, so they precede every dated row
+    if renewal_date is None:
+        return query.filter(or_(Hoarding.renewal_date.isnot(None),
+                                and_(Hoarding.renewal_date.is_(None), Hoarding.id > last_id)))
+    return query.filter(or_(Hoarding.renewal_date > renewal_date,
+                            and_(Hoarding.renewal_date == renewal_date, Hoarding.id > last_id)))
+
+def fetch_page(query, cursor, limit):
+    if cursor:
+        query = seek_after(query, cursor)
+    rows = query.limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def iter_hoardings(query, batch_size):
+    cursor = None
+    while True:
+        rows, next_cursor = fetch_page(query, cursor, batch_size)
+        yield from rows
+        if next_cursor is None:
+            return
+        cursor = decode_cursor(next_cursor)
+
+# ✅ Create tables, plus any columns / indexes missing from an existing database
+@app.cli.command('init-db')
+def init_db_command():
+    db.create_all()
+    create_version_triggers(db.engine)
+    table = Hoarding.__table__
+    existing = {c['name'] for c in inspect(db.engine).get_columns(table.name)}
+    with db.engine.begin() as conn:
+        for column in table.columns:
+            if column.name not in existing:
+                col_type = column.type.compile(dialect=db.engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+    for index in table.indexes:
+        index.create(bind=db.engine, checkfirst=True)
+    create_search_index(db.engine)
+    create_spatial_index(db.engine)
+    click.echo("Database initialised.")
+
+# ✅ Re-index every hoarding for full-text search
+@app.cli.command('rebuild-search')
+def rebuild_search_command():
+    count = rebuild_search_index()
+    click.echo(f"Indexed {count} hoarding(s).")
+
+# ✅ Build image derivatives for uploads that do not have them yet
+@app.cli.command('build-derivatives')
+def build_derivatives_command():
+    pending = db.session.query(Hoarding.id, Hoarding.image_filename).filter(
+        Hoarding.image_filename.isnot(None), Hoarding.thumb_filename.is_(None)).all()
+    for hoarding_id, filename in pending:
+        try:
+            apply_derivatives(hoarding_id, filename)
+        except OSError as e:
+            db.session.rollback()
+            click.echo(f"Skipped {filename}: {e}")
+    click.echo(f"Processed {len(pending)} image(s).")
+
+# ✅ One-off: rename legacy uploads to content-hash names
+@app.cli.command('migrate-uploads')
+def migrate_uploads_command():
+    migrated, missing = migrate_legacy_uploads()
+    for old, new in migrated.items():
+        click.echo(f"{old} -> {new}")
+    for name in missing:
+        click.echo(f"Missing on disk, left unchanged: {name}")
+    click.echo(f"Migrated {len(migrated)} file(s). Run build-derivatives to rebuild thumbnails.")
+
+# ✅ Parse coordinates out of existing location URLs and re-index them
+@app.cli.command('backfill-geo')
+def backfill_geo_command():
+    updated, unresolved = backfill_coordinates()
+    rebuild_spatial_index()
+    click.echo(f"Updated {updated} hoarding(s); {unresolved} URL(s) had no coordinates.")
+
+# ✅ Bulk import hoardings from a CSV / XLSX file
+@app.cli.command('import-hoardings')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user', 'email', required=True, help="Email of the user recorded as creator.")
+def import_hoardings_command(path, email):
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        raise click.BadParameter(f"No user {email}", param_hint='--user')
+    with open(path, 'rb') as f:
+        try:
+            result = import_rows(read_rows(f, path), user.id, app.config['IMPORT_BATCH_SIZE'])
+        except ImportFormatError as e:
+            raise click.ClickException(str(e))
+    for error in result['errors']:
+        details = '; '.join(f"{field}: {', '.join(msgs)}" for field, msgs in error['errors'].items())
+        click.echo(f"Row {error['row']}: {details}")
+    click.echo(f"Imported {result['imported']} hoarding(s), {len(result['errors'])} row(s) rejected.")
+
+# ✅ Export hoardings (optionally filtered) to CSV / XLSX
+@app.cli.command('export-hoardings')
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+@click.option('--place', default='')
+@click.option('--showroom', default='')
+def export_hoardings_command(path, place, showroom):
+    rows = iter_hoardings(filtered_hoardings(place, showroom), app.config['API_BATCH_SIZE'])
+    if path.lower().endswith('.xlsx'):
+        with open(path, 'wb') as f:
+            write_xlsx(rows, f)
+    else:
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            for chunk in iter_csv(rows):
+                f.write(chunk)
+    click.echo(f"Exported to {path}.")
+
+# ✅ Fill an empty (throwaway) database with synthetic users and hoardings
+@app.cli.command('seed-demo')
+@click.option('--users', default=20, show_default=True)
+@click.option('--hoardings', default=1000, show_default=True)
+@click.option('--seed', default=42, show_default=True)
+def seed_demo_command(users, hoardings, seed):
+    if User.query.first() is not None:
+        raise click.ClickException("Database is not empty; point DATABASE_URL at a throwaway file.")
+    started = datetime.now()
+    seed_database(users, hoardings, seed)
+    click.echo(f"Seeded {users} user(s) and {hoardings} hoarding(s) "
+               f"in {(datetime.now() - started).total_seconds():.1f}s.")
+
+# ✅ Hammer the database from several processes and report lock errors
+@app.cli.command('stress-db')
+@click.option('--workers', default=8, show_default=True)
+@click.option('--iterations', default=200, show_default=True)
+@click.option('--deferred', is_flag=True, help="Use plain BEGIN for writes (shows the old behaviour).")
+def stress_db_command(workers, iterations, deferred):
+    result = run_stress(app, workers, iterations, immediate=not deferred)
+    click.echo(f"{result['writes']} writes, {result['reads']} reads, "
+               f"{result['errors']} lock errors in {result['seconds']:.2f}s")
+    if result['errors']:
+        raise SystemExit(1)
+
 # ✅ Redirect root to login
 @app.route('/')
 def home_redirect():
@@ -64,36 +297,211 @@ def hoarding_logout():
 def hoarding_dashboard():
     place_filter = request.args.get('place', '')
     showroom_filter = request.args.get('showroom', '')
+    after = request.args.get('after', '')
 
-    query = Hoarding.query
-    if place_filter:
-        query = query.filter(Hoarding.place == place_filter)
-    if showroom_filter:
-        query = query.filter(Hoarding.showroom_name == showroom_filter)
+    # Unchanged data + same user/filters/day -> the browser's copy is current
+    version = data_version()
+    etag = page_etag(app, version, current_user.id, datetime.now().date(),
+                     place_filter, showroom_filter, after)
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
 
-    hoardings = query.order_by(Hoarding.renewal_date).all()
-    places = sorted(set(h.place for h in Hoarding.query.all()))
-    showrooms = sorted(set(h.showroom_name for h in Hoarding.query.all()))
-    chart_data = Counter(h.showroom_name for h in Hoarding.query.all())
+    facets = get_dashboard_facets(version)
+    use_fragments = etag is not None and app.config['FRAGMENT_CACHE_ENABLED']
+    fragment = fragment_cache.get(etag) if use_fragments else None
+    if fragment is None:
+        hoardings, next_cursor = fetch_page(filtered_hoardings(place_filter, showroom_filter),
+                                            decode_cursor(after) if after else None,
+                                            app.config['HOARDINGS_PER_PAGE'])
+        table_html = render_template("_hoarding_table.html",
+                                     hoardings=hoardings,
+                                     upcoming=facets['upcoming'])
+        if use_fragments:
+            fragment_cache.set(etag, table_html, next_cursor)
+    else:
+        table_html, next_cursor = fragment
 
-    labels = list(chart_data.keys())
-    values = list(chart_data.values())
-
-    upcoming = datetime.now().date() + timedelta(days=30)
-    total_hoardings = Hoarding.query.count()
-    upcoming_renewals = Hoarding.query.filter(Hoarding.renewal_date <= upcoming).count()
-
-    return render_template("dashboard.html",
-                           hoardings=hoardings,
-                           upcoming=upcoming,
-                           places=places,
-                           showrooms=showrooms,
+    html = render_template("dashboard.html",
+                           table_html=Markup(table_html),
+                           next_cursor=next_cursor,
+                           is_first_page=not after,
+                           upcoming=facets['upcoming'],
+                           places=facets['places'],
+                           showrooms=facets['showrooms'],
                            selected_place=place_filter,
                            selected_showroom=showroom_filter,
-                           labels=labels,
-                           values=values,
-                           total_hoardings=total_hoardings,
-                           upcoming_renewals=upcoming_renewals)
+                           labels=facets['labels'],
+                           values=facets['values'],
+                           total_hoardings=facets['total_hoardings'],
+                           upcoming_renewals=facets['upcoming_renewals'])
+    return set_revalidate(make_response(html), etag)
+
+# ✅ Hoardings API (newline-delimited JSON, resumable with cursor tokens)
+@app.route('/hoarding/api/hoardings')
+@login_required
+def hoarding_api_list():
+    place_filter = request.args.get('place', '')
+    showroom_filter = request.args.get('showroom', '')
+    limit = request.args.get('limit', type=int)
+    cursor = None
+    if request.args.get('cursor'):
+        cursor = decode_cursor(request.args['cursor'])
+        if cursor is None:
+            abort(400, "Invalid cursor")
+    if limit is not None and limit < 1:
+        abort(400, "limit must be positive")
+
+    batch_size = app.config['API_BATCH_SIZE']
+    query = filtered_hoardings(place_filter, showroom_filter)
+
+    def generate():
+        nonlocal cursor
+        remaining = limit
+        while True:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            rows, next_cursor = fetch_page(query, cursor, size)
+            for h in rows:
+                yield json.dumps(h.to_dict()) + '\n'
+            cursor = decode_cursor(next_cursor) if next_cursor else None
+            if remaining is not None:
+                remaining -= len(rows)
+            if next_cursor is None or remaining == 0:
+                break
+        yield json.dumps({'next_cursor': next_cursor}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+# ✅ Bulk import (admin only)
+@app.route('/hoarding/import', methods=['GET', 'POST'])
+@login_required
+def hoarding_import():
+    if not current_user.is_admin:
+        flash("Only admin can import hoardings.", "danger")
+        return redirect(url_for('hoarding_dashboard'))
+
+    form = ImportForm()
+    result = None
+    if form.validate_on_submit():
+        upload = form.file.data
+        try:
+            result = import_rows(read_rows(upload.stream, upload.filename),
+                                 current_user.id, app.config['IMPORT_BATCH_SIZE'])
+        except ImportFormatError as e:
+            flash(str(e), "danger")
+        else:
+            flash(f"Imported {result['imported']} hoarding(s), "
+                  f"{len(result['errors'])} row(s) rejected.",
+                  "success" if not result['errors'] else "warning")
+    return render_template("import.html", form=form, result=result)
+
+# ✅ Streaming export with the dashboard filters applied
+@app.route('/hoarding/export.<fmt>')
+@login_required
+def hoarding_export(fmt):
+    place_filter = request.args.get('place', '')
+    showroom_filter = request.args.get('showroom', '')
+    rows = iter_hoardings(filtered_hoardings(place_filter, showroom_filter),
+                          app.config['API_BATCH_SIZE'])
+    stamp = datetime.now().strftime('%Y%m%d')
+    if fmt == 'csv':
+        response = Response(stream_with_context(iter_csv(rows)), mimetype='text/csv')
+        response.headers['Content-Disposition'] = f'attachment; filename=hoardings-{stamp}.csv'
+        return response
+    if fmt == 'xlsx':
+        # Spills to disk past a few MB rather than holding the workbook in memory
+        out = tempfile.SpooledTemporaryFile(max_size=4 * 1024 * 1024)
+        write_xlsx(rows, out)
+        out.seek(0)
+        return send_file(out, as_attachment=True, download_name=f'hoardings-{stamp}.xlsx',
+                         mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    abort(404)
+
+# ✅ Uploaded images: content-hashed names never change, so cache them forever
+@app.route('/hoarding/media/<path:filename>')
+def hoarding_media(filename):
+    if not is_content_addressed(filename):
+        return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    response = send_from_directory(app.config['UPLOAD_FOLDER'], filename,
+                                   etag=filename,
+                                   max_age=app.config['UPLOAD_CACHE_MAX_AGE'])
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+# ✅ Full-text search (owner, contact, address, place, showroom)
+@app.route('/hoarding/search')
+@login_required
+def hoarding_search():
+    q = request.args.get('q', '').strip()
+    results = search_hoardings(q, app.config['SEARCH_RESULT_LIMIT']) if q else []
+    return render_template("search.html", q=q, hoardings=results,
+                           upcoming=datetime.now().date() + timedelta(days=30))
+
+@app.route('/hoarding/api/search')
+@login_required
+def hoarding_api_search():
+    q = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', app.config['SEARCH_RESULT_LIMIT'], type=int),
+                       app.config['API_BATCH_SIZE']))
+    return jsonify([h.to_dict() for h in search_hoardings(q, limit)] if q else [])
+
+# ✅ Hoardings near a showroom location
+def parse_float_args(*names):
+    try:
+        return [float(request.args[name]) for name in names]
+    except (KeyError, ValueError):
+        abort(400, f"Expected numeric {', '.join(names)}")
+
+def radius_arg():
+    radius = request.args.get('radius', app.config['NEARBY_DEFAULT_RADIUS_KM'], type=float)
+    return min(max(radius, 0), app.config['NEARBY_MAX_RADIUS_KM'])
+
+@app.route('/hoarding/nearby')
+@login_required
+def hoarding_nearby():
+    locations = app.config['SHOWROOM_COORDINATES']
+    selected = request.args.get('location', '')
+    radius = radius_arg()
+    results = []
+    if selected in locations:
+        results = hoardings_within(*locations[selected], radius, app.config['NEARBY_MAX_RESULTS'])
+    return render_template("nearby.html",
+                           locations=locations,
+                           selected_location=selected,
+                           radius=radius,
+                           max_radius=app.config['NEARBY_MAX_RADIUS_KM'],
+                           hoardings=[h for h, _ in results],
+                           distances={h.id: km for h, km in results},
+                           upcoming=datetime.now().date() + timedelta(days=30))
+
+@app.route('/hoarding/api/nearby')
+@login_required
+def hoarding_api_nearby():
+    if 'location' in request.args:
+        if request.args['location'] not in app.config['SHOWROOM_COORDINATES']:
+            abort(400, "Unknown showroom location")
+        lat, lng = app.config['SHOWROOM_COORDINATES'][request.args['location']]
+    else:
+        lat, lng = parse_float_args('lat', 'lng')
+    if 'k' in request.args:
+        k = request.args.get('k', 10, type=int)
+        if k < 1:
+            abort(400, "k must be positive")
+        results = nearest_hoardings(lat, lng, min(k, app.config['NEARBY_MAX_RESULTS']))
+    else:
+        results = hoardings_within(lat, lng, radius_arg(), app.config['NEARBY_MAX_RESULTS'])
+    return jsonify([dict(h.to_dict(), distance_km=round(km, 3)) for h, km in results])
+
+@app.route('/hoarding/api/within')
+@login_required
+def hoarding_api_within():
+    south, west, north, east = parse_float_args('south', 'west', 'north', 'east')
+    limit = app.config['NEARBY_MAX_RESULTS']
+    found = hoardings_in_bbox(south, west, north, east, limit + 1)
+    if len(found) > limit:
+        abort(400, f"More than {limit} hoardings in this area; zoom in")
+    return jsonify([h.to_dict() for h in found])
 
 # ✅ Add hoarding
 @app.route('/hoarding/add', methods=['GET', 'POST'])
@@ -101,12 +509,12 @@ def hoarding_dashboard():
 def hoarding_add():
     form = HoardingForm()
     if form.validate_on_submit():
-        filename = None
+        upload = None
         if form.image.data and allowed_file(form.image.data.filename):
-            fn = secure_filename(form.image.data.filename)
-            save_path = os.path.join(app.config['UPLOAD_FOLDER'], fn)
-            form.image.data.save(save_path)
-            filename = fn
+            upload = stage_upload(form.image.data)
+        # Lock only now that the upload is on disk; GETs never take it
+        use_immediate_transactions()
+        filename = upload.filename if upload else None
         h = Hoarding(
             size=form.size.data,
             renewal_date=form.renewal_date.data,
@@ -121,8 +529,18 @@ def hoarding_add():
             image_filename=filename,
             created_by=current_user.id
         )
-        db.session.add(h)
-        db.session.commit()
+        try:
+            db.session.add(h)
+            # The INSERT takes the write lock; only then is the file put in place
+            db.session.flush()
+            hoarding_id = h.id
+            if upload:
+                store_upload(upload)
+            db.session.commit()
+        finally:
+            discard_upload(upload)
+        if filename:
+            submit_derivatives(hoarding_id, filename)
         flash("Hoarding added!", "success")
         return redirect(url_for('hoarding_dashboard'))
     return render_template("hoarding_form.html", form=form)
@@ -138,14 +556,27 @@ def hoarding_edit(id):
 
     form = HoardingForm(obj=h)
     if form.validate_on_submit():
+        upload = new_image = old_image = None
         if form.image.data and allowed_file(form.image.data.filename):
-            fn = secure_filename(form.image.data.filename)
-            save_path = os.path.join(app.config['UPLOAD_FOLDER'], fn)
-            form.image.data.save(save_path)
-            h.image_filename = fn
+            upload = stage_upload(form.image.data)
+        try:
+            # Ends the read transaction; h is re-read under the write lock
+            use_immediate_transactions()
+            if upload and upload.filename != h.image_filename:
+                new_image, old_image = upload.filename, h.image_filename
+                h.image_filename = new_image
+                h.thumb_filename = h.preview_filename = None
 
-        form.populate_obj(h)
-        db.session.commit()
+            form.populate_obj(h)
+            db.session.flush()
+            if upload:
+                store_upload(upload)
+            release(old_image)
+            db.session.commit()
+        finally:
+            discard_upload(upload)
+        if new_image:
+            submit_derivatives(id, new_image)
         flash("Hoarding updated.", "success")
         return redirect(url_for('hoarding_dashboard'))
 
@@ -155,12 +586,16 @@ def hoarding_edit(id):
 @app.route('/hoarding/delete/<int:id>')
 @login_required
 def hoarding_delete(id):
-    h = Hoarding.query.get_or_404(id)
     if not current_user.is_admin:
         flash("Only admin can delete hoardings.", "danger")
         return redirect(url_for('hoarding_dashboard'))
 
+    use_immediate_transactions()
+    h = Hoarding.query.get_or_404(id)
+    image = h.image_filename
     db.session.delete(h)
+    db.session.flush()
+    release(image)
     db.session.commit()
     flash("Hoarding deleted.", "success")
     return redirect(url_for('hoarding_dashboard'))
@@ -177,12 +612,15 @@ def hoarding_create_user():
         email = request.form['email']
         password = request.form['password']
         is_admin = 'is_admin' in request.form
+        # Hash before taking the write lock; it is the slow part
+        password_hash = generate_password_hash(password)
 
+        use_immediate_transactions()
         if User.query.filter_by(email=email).first():
             flash("User already exists!", "warning")
         else:
             new_user = User(email=email,
-                            password=generate_password_hash(password),
+                            password=password_hash,
                             is_admin=is_admin)
             db.session.add(new_user)
             db.session.commit()
@@ -0,0 +1,256 @@
+"""In-process load test for the hoardings app.
+
+Seeds a throwaway SQLite file with synthetic data, drives the main pages
+through the Flask test client and reports latency percentiles, throughput
+and queries per request. It exits non-zero when a scenario regresses
+against the stored baseline, or when the baseline was recorded with other
+parameters.
+
+The dashboard scenarios run with the fragment cache off, so every request
+renders the listing; dashboard_cached measures the cache-hit path.
+
+    python benchmark.py --save-baseline          # record benchmark_baseline.json
+    python benchmark.py                          # compare against it
+    python benchmark.py --hoardings 10000 --no-compare
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+from datetime import date, timedelta
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+ADMIN_EMAIL, PASSWORD = 'admin@example.com', 'password'
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    p.add_argument('--hoardings', type=int, default=5000, help="rows to seed (1k - 1M)")
+    p.add_argument('--users', type=int, default=20)
+    p.add_argument('--iterations', type=int, default=50, help="timed requests per scenario")
+    p.add_argument('--warmup', type=int, default=3)
+    p.add_argument('--seed', type=int, default=42)
+    p.add_argument('--baseline', default=BASELINE_FILE)
+    p.add_argument('--save-baseline', action='store_true')
+    p.add_argument('--no-compare', action='store_true',
+                   help="only report; do not check against the baseline")
+    p.add_argument('--tolerance', type=float, default=0.5,
+                   help="allowed p95 slowdown vs baseline (0.5 = +50%%)")
+    p.add_argument('--min-delta-ms', type=float, default=2.0,
+                   help="ignore p95 slowdowns smaller than this (timer noise on fast pages)")
+    p.add_argument('--json', help="also write the results to this file")
+    p.add_argument('--keep-db', action='store_true', help="leave the throwaway database behind")
+    return p.parse_args(argv)
+
+
+def percentile(sorted_values, pct):
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def sample_images(rng, count=4):
+    # Encoded once up front so the timings cover the upload, not the encoding
+    from PIL import Image
+    images = []
+    for _ in range(count):
+        buf = io.BytesIO()
+        Image.new('RGB', (1600, 1200), tuple(rng.randrange(256) for _ in range(3))).save(buf, 'JPEG')
+        images.append(buf.getvalue())
+    return images
+
+
+def form_data(rng, places, image=None):
+    data = {
+        'size': '20x10',
+        'renewal_date': (date.today() + timedelta(days=rng.randint(1, 365))).isoformat(),
+        'amount': str(rng.randint(5000, 50000)),
+        'place': rng.choice(places),
+        'owner_name': 'Bench Owner',
+        'contact': f'9{rng.randint(0, 999999999):09d}',
+        'address': 'Benchmark Road',
+        'location_url': f'https://www.google.com/maps?q=8.{rng.randint(300000, 900000)},76.9',
+        'showroom_name': 'Rajakumari Hypermarket',
+        'showroom_location': 'Attingal',
+    }
+    if image is not None:
+        data['image'] = (image, 'bench.jpg')
+    return data
+
+
+def build_scenarios(app, client, rng, places, showrooms, hoarding_ids):
+    images = sample_images(rng)
+
+    def login():
+        return client.post('/hoarding/login', data={'email': ADMIN_EMAIL, 'password': PASSWORD}), 302
+
+    def dashboard():
+        return client.get('/hoarding/dashboard'), 200
+
+    def dashboard_place():
+        return client.get('/hoarding/dashboard', query_string={'place': rng.choice(places)}), 200
+
+    def dashboard_showroom():
+        return client.get('/hoarding/dashboard', query_string={'showroom': rng.choice(showrooms)}), 200
+
+    def dashboard_cached():
+        app.config['FRAGMENT_CACHE_ENABLED'] = True
+        try:
+            return client.get('/hoarding/dashboard'), 200
+        finally:
+            app.config['FRAGMENT_CACHE_ENABLED'] = False
+
+    def add():
+        return client.post('/hoarding/add', data=form_data(rng, places)), 302
+
+    def edit():
+        return client.post(f'/hoarding/edit/{rng.choice(hoarding_ids)}', data=form_data(rng, places)), 302
+
+    def upload():
+        image = io.BytesIO(rng.choice(images))
+        return client.post('/hoarding/add', data=form_data(rng, places, image),
+                           content_type='multipart/form-data'), 302
+
+    return {fn.__name__: fn for fn in (login, dashboard, dashboard_place, dashboard_showroom,
+                                       dashboard_cached, add, edit, upload)}
+
+
+def run_scenario(fn, iterations, warmup, counter):
+    for _ in range(warmup):
+        fn()
+    latencies, queries = [], 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        counter['n'] = 0
+        t0 = time.perf_counter()
+        response, expected = fn()
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if response.status_code != expected:
+            raise RuntimeError(f"{fn.__name__}: expected {expected}, got {response.status_code}")
+        queries += counter['n']
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'rps': round(iterations / elapsed, 1),
+        'queries': round(queries / iterations, 1),
+    }
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    failures = []
+    for name, base in baseline['scenarios'].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        limit = max(base['p95_ms'] * (1 + tolerance), base['p95_ms'] + min_delta_ms)
+        if current['p95_ms'] > limit:
+            failures.append(f"{name}: p95 {current['p95_ms']}ms > baseline {base['p95_ms']}ms")
+        if current['queries'] > base['queries']:
+            failures.append(f"{name}: {current['queries']} queries/request > baseline {base['queries']}")
+    return failures
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='hoardings-bench-')
+    # Must be set before the app (and its Config) is imported
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+
+    from sqlalchemy import event
+    from app import app, db, fragment_cache
+    from models import Hoarding
+    from images import wait_for_derivatives
+
+    # Off except in dashboard_cached: a cache hit would skip the listing query
+    app.config.update(WTF_CSRF_ENABLED=False,
+                      UPLOAD_FOLDER=os.path.join(workdir, 'uploads'),
+                      FRAGMENT_CACHE_ENABLED=False)
+    os.makedirs(app.config['UPLOAD_FOLDER'])
+    try:
+        runner = app.test_cli_runner()
+        for command in (['init-db'],
+                        ['seed-demo', '--users', str(args.users),
+                         '--hoardings', str(args.hoardings), '--seed', str(args.seed)]):
+            result = runner.invoke(args=command)
+            if result.exit_code != 0:
+                raise RuntimeError(result.output or repr(result.exception))
+            print(result.output.strip())
+
+        with app.app_context():
+            places = [p for (p,) in db.session.query(Hoarding.place).distinct().limit(200)]
+            showrooms = [s for (s,) in db.session.query(Hoarding.showroom_name).distinct()]
+            hoarding_ids = [i for (i,) in db.session.query(Hoarding.id).limit(5000)]
+            engine = db.engine
+
+        # Count only the request thread's statements, not the image workers'
+        counter = {'n': 0}
+        main_thread = threading.main_thread()
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def count_query(*_args):
+            if threading.current_thread() is main_thread:
+                counter['n'] += 1
+
+        rng = random.Random(args.seed)
+        client = app.test_client()
+        client.post('/hoarding/login', data={'email': ADMIN_EMAIL, 'password': PASSWORD})
+        results = {}
+        for name, fn in build_scenarios(app, client, rng, places, showrooms, hoarding_ids).items():
+            results[name] = run_scenario(fn, args.iterations, args.warmup, counter)
+        wait_for_derivatives()
+    finally:
+        if args.keep_db:
+            print(f"Database kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    params = {'hoardings': args.hoardings, 'users': args.users, 'iterations': args.iterations,
+              'warmup': args.warmup, 'seed': args.seed}
+    print(f"\n{'scenario':<20}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'queries':>9}")
+    for name, r in results.items():
+        print(f"{name:<20}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['rps']:>9}{r['queries']:>9}")
+    print(f"fragment cache: {len(fragment_cache)} entries, {fragment_cache.size} bytes")
+
+    report = {'params': params, 'scenarios': results}
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if args.no_compare:
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"ERROR no baseline at {args.baseline}; run with --save-baseline or --no-compare.")
+        return 2
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline['params'] != params:
+        print(f"ERROR baseline was recorded with {baseline['params']}, this run used {params}; "
+              f"re-record it or pass --no-compare.")
+        return 2
+    failures = compare(results, baseline, args.tolerance, args.min_delta_ms)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if not failures:
+        print("No regressions against baseline.")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+import io
+import csv
+import codecs
+import zlib
+import zipfile
+from datetime import date, datetime
+
+from werkzeug.datastructures import MultiDict
+
+from models import db, Hoarding
+from forms import HoardingForm
+from database import use_immediate_transactions
+
+# Columns that map straight onto HoardingForm / Hoarding fields
+FIELDS = ('size', 'renewal_date', 'amount', 'place', 'owner_name', 'contact',
+          'address', 'location_url', 'showroom_name', 'showroom_location')
+EXPORT_COLUMNS = ('id',) + FIELDS + ('latitude', 'longitude', 'image_filename', 'created_by')
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+# What a corrupt or renamed .xlsx raises from zipfile / openpyxl / the XML parser
+XLSX_ERRORS = (zipfile.BadZipFile, zlib.error, EOFError, KeyError, SyntaxError, ValueError)
+
+
+def _normalise(header):
+    return ''.join(ch for ch in str(header or '').lower() if ch.isalnum())
+
+
+def _header_map(headers):
+    # Accept field names ('owner_name') as well as form labels ("Owner's Name")
+    form = HoardingForm(formdata=None, meta={'csrf': False})
+    aliases = {}
+    for name in FIELDS:
+        aliases[_normalise(name)] = name
+        aliases[_normalise(form[name].label.text)] = name
+    mapping = {i: aliases[_normalise(h)] for i, h in enumerate(headers) if _normalise(h) in aliases}
+    missing = set(FIELDS) - set(mapping.values())
+    if missing:
+        raise ImportFormatError(f"Missing column(s): {', '.join(sorted(missing))}")
+    return mapping
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).strip()
+
+
+# ─── Streaming readers: yield (spreadsheet row number, {field: text}) ───────
+def _rows(raw_rows):
+    raw_rows = iter(raw_rows)
+    mapping = _header_map(next(raw_rows, None) or [])
+    for number, values in enumerate(raw_rows, start=2):
+        if not any(_cell(v) for v in values):
+            continue
+        yield number, {field: _cell(values[i]) if i < len(values) else ''
+                       for i, field in mapping.items()}
+
+
+def _guard(raw_rows, errors, message):
+    # Lazily parsed files can fail part-way; report that as a format error
+    try:
+        yield from raw_rows
+    except errors as e:
+        raise ImportFormatError(f"{message}: {e}") from e
+
+
+def _closing(workbook, raw_rows):
+    # A read_only workbook keeps its archive open until close()
+    try:
+        yield from raw_rows
+    finally:
+        workbook.close()
+
+
+def _check_utf8(stream):
+    # Decode everything up front, so a bad byte cannot stop the import halfway
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    offset = 0
+    try:
+        for chunk in iter(lambda: stream.read(64 * 1024), b''):
+            decoder.decode(chunk)
+            offset += len(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(f"CSV file is not UTF-8 (bad byte near offset {offset + e.start}); "
+                                f"save it as \"CSV UTF-8\" and try again")
+    stream.seek(0)
+
+
+def read_csv(stream):
+    _check_utf8(stream)
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    return _rows(_guard(csv.reader(text), csv.Error, "Unreadable CSV file"))
+
+
+def read_xlsx(stream):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("XLSX import needs the openpyxl package")
+    try:
+        # read_only parses the sheet lazily instead of loading it all into memory
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except XLSX_ERRORS as e:
+        raise ImportFormatError(f"Not a valid .xlsx file: {e}") from e
+    # Corrupt sheet XML only shows up while iterating
+    return _rows(_guard(_closing(workbook, workbook.active.iter_rows(values_only=True)),
+                        XLSX_ERRORS, "Unreadable .xlsx file"))
+
+
+def read_rows(stream, filename):
+    ext = filename.rsplit('.', 1)[-1].lower()
+    if ext == 'csv':
+        return read_csv(stream)
+    if ext == 'xlsx':
+        return read_xlsx(stream)
+    raise ImportFormatError("Only .csv and .xlsx files can be imported")
+
+
+# ─── Import ────────────────────────────────────────────────────────────────
+def validate_row(values):
+    form = HoardingForm(formdata=MultiDict(values), meta={'csrf': False})
+    # The image is uploaded separately, never through a spreadsheet
+    del form.image
+    if not form.validate():
+        return None, {name: errors for name, errors in form.errors.items()}
+    return {name: form[name].data for name in FIELDS}, None
+
+
+def import_rows(rows, created_by, batch_size=500):
+    result = {'imported': 0, 'errors': []}
+    batch = []
+
+    def flush():
+        use_immediate_transactions()
+        db.session.add_all(batch)
+        db.session.commit()
+        result['imported'] += len(batch)
+        batch.clear()
+
+    try:
+        for number, values in rows:
+            data, errors = validate_row(values)
+            if errors:
+                result['errors'].append({'row': number, 'errors': errors})
+                continue
+            batch.append(Hoarding(created_by=created_by, **data))
+            if len(batch) >= batch_size:
+                flush()
+    except ImportFormatError as e:
+        if result['imported']:
+            raise ImportFormatError(f"{e} ({result['imported']} row(s) before it were already "
+                                    f"imported)") from e
+        raise
+    if batch:
+        flush()
+    return result
+
+
+# ─── Export ────────────────────────────────────────────────────────────────
+def export_values(h):
+    row = h.to_dict()
+    return [row[column] for column in EXPORT_COLUMNS]
+
+
+# ✅ CSV text produced one row at a time, so memory stays flat
+def iter_csv(hoardings):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for h in hoardings:
+        writer.writerow(export_values(h))
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def write_xlsx(hoardings, fileobj):
+    from openpyxl import Workbook
+    # write_only streams rows to disk instead of building the sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Hoardings')
+    sheet.append(EXPORT_COLUMNS)
+    for h in hoardings:
+        sheet.append(export_values(h))
+    workbook.save(fileobj)
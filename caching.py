@@ -0,0 +1,122 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import request, session, Response
+from sqlalchemy import text
+
+from models import db, DataVersion
+
+# ─── Global data version ───────────────────────────────────────────────────
+# One row, bumped by triggers on every write to hoarding or user, so all
+# gunicorn workers (and CLI imports) agree on when cached pages went stale.
+VERSIONED_TABLES = ('hoarding', 'user')
+
+
+def _version_triggers():
+    bump = f'UPDATE {DataVersion.__tablename__} SET version = version + 1 WHERE id = 1;'
+    for table in VERSIONED_TABLES:
+        for op in ('INSERT', 'UPDATE', 'DELETE'):
+            yield (f'CREATE TRIGGER IF NOT EXISTS {table}_version_{op.lower()} '
+                   f'AFTER {op} ON "{table}" BEGIN {bump} END')
+
+
+def create_version_triggers(engine):
+    if engine.dialect.name != 'sqlite':
+        return False
+    with engine.begin() as conn:
+        conn.execute(text(f'INSERT OR IGNORE INTO {DataVersion.__tablename__} (id, version) VALUES (1, 0)'))
+        for statement in _version_triggers():
+            conn.exec_driver_sql(statement)
+    return True
+
+
+def data_version():
+    return db.session.execute(
+        text(f'SELECT version FROM {DataVersion.__tablename__} WHERE id = 1')).scalar()
+
+
+# ─── Conditional GET ───────────────────────────────────────────────────────
+def _deploy_fingerprint(app):
+    # Changes on deploy, identical across workers, so ETags survive restarts
+    paths = [os.path.join(app.root_path, name) for name in os.listdir(app.root_path)
+             if name.endswith('.py')]
+    for root, _dirs, files in os.walk(os.path.join(app.root_path, app.template_folder)):
+        paths += [os.path.join(root, name) for name in files]
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(paths):
+        st = os.stat(path)
+        digest.update(f'{path}:{st.st_mtime_ns}:{st.st_size}'.encode())
+    return digest.hexdigest()
+
+
+_fingerprint = None
+
+
+def page_etag(app, version, *parts):
+    global _fingerprint
+    if version is None:
+        return None
+    if _fingerprint is None:
+        _fingerprint = _deploy_fingerprint(app)
+    raw = '|'.join(str(p) for p in (_fingerprint, version, *parts))
+    return hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+
+
+def not_modified(etag):
+    # Pending flash messages have to be rendered, so never short-circuit them
+    if etag is None or session.get('_flashes'):
+        return None
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        set_revalidate(response, etag)
+        return response
+    return None
+
+
+def set_revalidate(response, etag):
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+# ─── Rendered-fragment cache ───────────────────────────────────────────────
+class FragmentCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def set(self, key, html, extra=None):
+        cost = len(html)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= len(old[0])
+            self._items[key] = (html, extra)
+            self.size += cost
+            # Evict least recently used fragments until we fit again
+            while self.size > self.max_bytes:
+                _key, (evicted, _extra) = self._items.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,51 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # optional: pip install Brotli
+    brotli = None
+
+from flask import request
+
+COMPRESSIBLE_TYPES = {'text/html', 'application/json', 'text/css', 'application/javascript',
+                      'text/plain', 'text/csv'}
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality('br') > 0:
+        return 'br'
+    if accepted.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def compress_response(response, app):
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = _choose_encoding()
+    data = response.get_data()
+    if encoding is None or len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    if encoding == 'br':
+        data = brotli.compress(data, quality=app.config['COMPRESS_BROTLI_QUALITY'])
+    else:
+        data = gzip.compress(data, compresslevel=app.config['COMPRESS_GZIP_LEVEL'], mtime=0)
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    # Compressed bytes differ from the identity ones; only weak ETags still apply
+    if response.headers.get('ETag', '').startswith('"'):
+        del response.headers['ETag']
+    return response
+
+
+# ✅ gzip / brotli for HTML and JSON responses
+def init_compression(app):
+    if app.config['COMPRESS_RESPONSES']:
+        app.after_request(lambda response: compress_response(response, app))
@@ -2,10 +2,75 @@ import os
 
 class Config:
     SECRET_KEY = os.urandom(24)
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///database.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///database.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # ─── SQLite concurrency (several gunicorn workers, one database file) ──
+    SQLITE_CONCURRENCY = True
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',        # readers never wait for the writer
+        'synchronous': 'NORMAL',      # safe with WAL, far fewer fsyncs
+        'busy_timeout': 15000,        # ms to wait for the write lock
+        'cache_size': -16000,         # 16 MB page cache per connection
+        'mmap_size': 128 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,
+        'connect_args': {'timeout': 15},
+    }
+    # Each sync gunicorn worker serves one request at a time; keep a small pool.
+    # File databases only: in-memory SQLite uses a StaticPool, which has no size.
+    SQLITE_POOL_OPTIONS = {
+        'pool_size': 2,
+        'max_overflow': 4,
+    }
+
+    # ─── Request instrumentation (Server-Timing, slow / N+1 query log) ─────
+    PERF_INSTRUMENTATION = os.environ.get('PERF_INSTRUMENTATION') == '1'
+    PERF_SLOW_REQUEST_MS = 500
+    PERF_N_PLUS_ONE_THRESHOLD = 10
+    PERF_SLOWEST_STATEMENTS = 5
+
+    # ─── Dashboard caching and compression ─────────────────────────────────
+    FRAGMENT_CACHE_ENABLED = True
+    FRAGMENT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    COMPRESS_RESPONSES = True
+    COMPRESS_MIN_SIZE = 500
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 5
+
+    # ─── Listing / API page sizes ──────────────────────────────────────────
+    HOARDINGS_PER_PAGE = 50
+    API_BATCH_SIZE = 500
+    SEARCH_RESULT_LIMIT = 50
+    IMPORT_BATCH_SIZE = 500
+
+    # ─── Nearby search ─────────────────────────────────────────────────────
+    # Approximate town-centre coordinates for each HoardingForm showroom_location
+    SHOWROOM_COORDINATES = {
+        'Trivandrum':   (8.5241, 76.9366),
+        'Kaliyikavila': (8.3316, 77.1538),
+        'Attingal':     (8.6966, 76.8153),
+        'Kallambalam':  (8.7573, 76.7937),
+        'Pothencode':   (8.6195, 76.9033),
+        'Kattakada':    (8.5062, 77.0819),
+        'Paripally':    (8.8106, 76.7559),
+        'Kottiyam':     (8.8652, 76.6727),
+        'Trissur':      (10.5276, 76.2144),
+    }
+    NEARBY_DEFAULT_RADIUS_KM = 5
+    NEARBY_MAX_RADIUS_KM = 50
+    NEARBY_MAX_RESULTS = 500
+
     # ─── Image upload settings ─────────────────────────────────────────────
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+
+    # Downscaled copies built in the background: name -> max width (px)
+    IMAGE_DERIVATIVES = {'thumb': 120, 'preview': 1024}
+    IMAGE_DERIVATIVE_FORMAT = 'WEBP'
+    IMAGE_DERIVATIVE_QUALITY = 80
+    IMAGE_WORKERS = 2
+    UPLOAD_CACHE_MAX_AGE = 365 * 24 * 3600
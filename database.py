@@ -0,0 +1,114 @@
+import time
+import multiprocessing
+
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+
+from models import db, Hoarding
+
+
+# ─── SQLite tuning for multi-worker (gunicorn) deployments ─────────────────
+def _is_file_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+# Must run before db.init_app(), which creates the engine from these options
+def sqlite_engine_options(app):
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if app.config['SQLITE_CONCURRENCY'] and _is_file_sqlite(url):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {**app.config['SQLALCHEMY_ENGINE_OPTIONS'],
+                                                   **app.config['SQLITE_POOL_OPTIONS']}
+
+
+def configure_sqlite(app):
+    with app.app_context():
+        engine = db.engine
+    if not app.config['SQLITE_CONCURRENCY'] or not _is_file_sqlite(engine.url):
+        return
+    pragmas = app.config['SQLITE_PRAGMAS']
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_conn, _record):
+        # Let SQLAlchemy emit BEGIN itself so write transactions can be IMMEDIATE
+        dbapi_conn.isolation_level = None
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def on_begin(conn):
+        conn.exec_driver_sql('BEGIN IMMEDIATE' if wants_immediate() else 'BEGIN')
+
+    @event.listens_for(db.session, 'after_transaction_end')
+    def on_transaction_end(session, transaction):
+        # Only the next transaction is IMMEDIATE: reads after the commit
+        # (templates, expired objects) must not queue for the write lock
+        if transaction.parent is None and has_app_context():
+            g.pop('sqlite_immediate', None)
+
+
+def wants_immediate():
+    return has_app_context() and g.get('sqlite_immediate', False)
+
+
+# ✅ Take the write lock when the transaction starts, not on first write
+def use_immediate_transactions():
+    # A read transaction opened earlier (e.g. loading current_user) could not
+    # be upgraded safely, so end it; the next transaction begins IMMEDIATE
+    if db.session().in_transaction():
+        db.session.rollback()
+    g.sqlite_immediate = True
+
+
+# ─── Concurrency stress check ──────────────────────────────────────────────
+STRESS_PLACE = '__stress__'
+
+
+def _stress_worker(app, iterations, immediate, results):
+    # Forked children must not reuse the parent's pooled connections
+    with app.app_context():
+        db.engine.dispose(close=False)
+    errors = writes = reads = 0
+    try:
+        for i in range(iterations):
+            with app.app_context():
+                try:
+                    db.session.query(Hoarding).filter_by(showroom_name='stress').count()
+                    reads += 1
+                    if immediate:
+                        use_immediate_transactions()
+                    h = Hoarding(place=STRESS_PLACE, size=str(i), showroom_name='stress')
+                    db.session.add(h)
+                    db.session.flush()
+                    h.amount = float(i)
+                    db.session.commit()
+                    writes += 1
+                except OperationalError:
+                    db.session.rollback()
+                    errors += 1
+    finally:
+        # Always report back, or the parent would wait forever
+        results.put((writes, reads, errors))
+
+
+def run_stress(app, workers, iterations, immediate=True):
+    ctx = multiprocessing.get_context('fork')
+    results = ctx.Queue()
+    started = time.perf_counter()
+    procs = [ctx.Process(target=_stress_worker, args=(app, iterations, immediate, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    totals = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - started
+
+    with app.app_context():
+        Hoarding.query.filter_by(place=STRESS_PLACE).delete()
+        db.session.commit()
+    writes, reads, errors = (sum(t[i] for t in totals) for i in range(3))
+    return {'writes': writes, 'reads': reads, 'errors': errors, 'seconds': elapsed}
@@ -1,6 +1,6 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField, FloatField, DateField, SelectField
-from flask_wtf.file import FileField, FileAllowed
+from flask_wtf.file import FileField, FileAllowed, FileRequired
 from wtforms.validators import DataRequired
 
 class LoginForm(FlaskForm):
@@ -38,3 +38,7 @@ class HoardingForm(FlaskForm):
 
     image             = FileField("Hoarding Image", validators=[FileAllowed(['jpg','png','jpeg','gif'])])
     submit            = SubmitField("Save")
+
+class ImportForm(FlaskForm):
+    file   = FileField("CSV / Excel File", validators=[FileRequired(), FileAllowed(['csv', 'xlsx'])])
+    submit = SubmitField("Import")
@@ -0,0 +1,181 @@
+import re
+import math
+from urllib.parse import urlparse, parse_qs, unquote
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import joinedload
+
+from models import db, Hoarding
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+
+# ─── Google Maps URL parsing (offline, no geocoding) ───────────────────────
+_NUM = r'(-?\d{1,3}(?:\.\d+)?)'
+# Place links carry the pin as !3d<lat>!4d<lng>; prefer it over the viewport
+_PIN = re.compile(r'!3d' + _NUM + r'!4d' + _NUM)
+_AT = re.compile(r'@' + _NUM + r',' + _NUM)
+_PAIR = re.compile(r'^\s*' + _NUM + r'\s*,\s*' + _NUM + r'\s*$')
+_QUERY_KEYS = ('q', 'query', 'll', 'sll', 'center', 'destination', 'daddr', 'viewpoint')
+
+
+def _valid(lat, lng):
+    return -90 <= lat <= 90 and -180 <= lng <= 180
+
+
+def parse_coordinates(url):
+    if not url:
+        return None
+    url = unquote(url.strip())
+    candidates = []
+    for pattern in (_PIN, _AT):
+        candidates += pattern.findall(url)
+    params = parse_qs(urlparse(url).query)
+    for key in _QUERY_KEYS:
+        for value in params.get(key, []):
+            m = _PAIR.match(value.replace('loc:', ''))
+            if m:
+                candidates.append(m.groups())
+    m = _PAIR.match(url)
+    if m:
+        candidates.append(m.groups())
+    for lat, lng in candidates:
+        lat, lng = float(lat), float(lng)
+        if _valid(lat, lng):
+            return lat, lng
+    # Short links (maps.app.goo.gl/...) cannot be resolved without a request
+    return None
+
+
+# ✅ Keep latitude / longitude in step with location_url on every ORM save
+@event.listens_for(Hoarding, 'before_insert')
+@event.listens_for(Hoarding, 'before_update')
+def _sync_coordinates(mapper, connection, target):
+    coords = parse_coordinates(target.location_url)
+    target.latitude, target.longitude = coords if coords else (None, None)
+
+
+def backfill_coordinates(batch_size=500):
+    updated = unresolved = 0
+    last_id = 0
+    while True:
+        rows = (Hoarding.query.filter(Hoarding.id > last_id)
+                .order_by(Hoarding.id).limit(batch_size).all())
+        if not rows:
+            break
+        for h in rows:
+            coords = parse_coordinates(h.location_url)
+            if coords is None:
+                unresolved += 1
+            elif coords != (h.latitude, h.longitude):
+                h.latitude, h.longitude = coords
+                updated += 1
+        last_id = rows[-1].id
+        db.session.commit()
+    return updated, unresolved
+
+
+# ─── R*Tree spatial index ──────────────────────────────────────────────────
+RTREE_TABLE = 'hoarding_rtree'
+
+SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE}
+        USING rtree(id, min_lat, max_lat, min_lng, max_lng)""",
+    f"""CREATE TRIGGER IF NOT EXISTS hoarding_rtree_ai AFTER INSERT ON hoarding
+        WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+        INSERT INTO {RTREE_TABLE} VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS hoarding_rtree_ad AFTER DELETE ON hoarding BEGIN
+        DELETE FROM {RTREE_TABLE} WHERE id = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS hoarding_rtree_au AFTER UPDATE OF latitude, longitude ON hoarding BEGIN
+        DELETE FROM {RTREE_TABLE} WHERE id = old.id;
+        INSERT INTO {RTREE_TABLE}
+            SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+            WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END""",
+]
+
+
+def create_spatial_index(engine):
+    if engine.dialect.name != 'sqlite':
+        return False
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.exec_driver_sql(statement)
+    return True
+
+
+def rebuild_spatial_index():
+    db.session.execute(text(f'DELETE FROM {RTREE_TABLE}'))
+    db.session.execute(text(
+        f'INSERT INTO {RTREE_TABLE} SELECT id, latitude, latitude, longitude, longitude '
+        f'FROM hoarding WHERE latitude IS NOT NULL AND longitude IS NOT NULL'))
+    db.session.commit()
+
+
+# ─── Queries ───────────────────────────────────────────────────────────────
+def haversine_km(lat1, lng1, lat2, lng2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bbox_around(lat, lng, radius_km):
+    dlat = radius_km / KM_PER_DEG_LAT
+    dlng = radius_km / (KM_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    return lat - dlat, lng - dlng, lat + dlat, lng + dlng
+
+
+def ids_in_bbox(south, west, north, east, limit):
+    return db.session.execute(text(
+        f'SELECT id FROM {RTREE_TABLE} WHERE max_lat >= :s AND min_lat <= :n '
+        f'AND max_lng >= :w AND min_lng <= :e LIMIT :limit'),
+        {'s': south, 'n': north, 'w': west, 'e': east, 'limit': limit}).scalars().all()
+
+
+def _load(ids):
+    if not ids:
+        return []
+    return Hoarding.query.options(joinedload(Hoarding.user)).filter(Hoarding.id.in_(ids)).all()
+
+
+def hoardings_in_bbox(south, west, north, east, limit):
+    return _load(ids_in_bbox(south, west, north, east, limit))
+
+
+def _candidates(lat, lng, radius_km, limit):
+    # Nearest `limit` index entries inside the box, as (id, km) within radius.
+    # Ordered in SQL by the flat-earth distance, which ranks like haversine at
+    # these scales, so only ids and coordinates ever leave the index.
+    south, west, north, east = bbox_around(lat, lng, radius_km)
+    rows = db.session.execute(text(
+        f'SELECT id, min_lat, min_lng FROM {RTREE_TABLE} '
+        f'WHERE max_lat >= :s AND min_lat <= :n AND max_lng >= :w AND min_lng <= :e '
+        f'ORDER BY (min_lat - :lat) * (min_lat - :lat) '
+        f'+ (min_lng - :lng) * (min_lng - :lng) * :lng_scale LIMIT :limit'),
+        {'s': south, 'n': north, 'w': west, 'e': east, 'lat': lat, 'lng': lng,
+         'lng_scale': math.cos(math.radians(lat)) ** 2, 'limit': limit}).all()
+    found = [(i, haversine_km(lat, lng, row_lat, row_lng)) for i, row_lat, row_lng in rows]
+    return [pair for pair in found if pair[1] <= radius_km]
+
+
+def _with_distances(lat, lng, hoardings):
+    found = [(h, haversine_km(lat, lng, h.latitude, h.longitude)) for h in hoardings]
+    return sorted(found, key=lambda pair: pair[1])
+
+
+# ✅ Up to `limit` hoardings within radius_km of a point, nearest first, as (hoarding, km)
+def hoardings_within(lat, lng, radius_km, limit):
+    return _with_distances(lat, lng, _load([i for i, _ in _candidates(lat, lng, radius_km, limit)]))
+
+
+# ✅ k nearest hoardings, widening the R*Tree window until k fall inside it
+def nearest_hoardings(lat, lng, k, start_km=2.0, max_km=1000.0):
+    radius = start_km
+    while True:
+        found = _candidates(lat, lng, radius, k)
+        if len(found) >= k or radius >= max_km:
+            return _with_distances(lat, lng, _load([i for i, _ in found]))
+        radius *= 2
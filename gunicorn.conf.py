@@ -0,0 +1,11 @@
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:8080')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+
+
+def post_fork(server, worker):
+    # Give every worker its own SQLite connections instead of inherited ones
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -0,0 +1,149 @@
+import os
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+from PIL import Image, ImageOps, ExifTags
+
+from models import db, Hoarding
+from database import use_immediate_transactions
+
+log = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=app.config['IMAGE_WORKERS'],
+                                       thread_name_prefix='image-derivatives')
+    return _executor
+
+
+# ─── Derivative generation ─────────────────────────────────────────────────
+def derivative_name(filename, kind):
+    stem = os.path.splitext(filename)[0]
+    return f"{stem}.{kind}.{current_app.config['IMAGE_DERIVATIVE_FORMAT'].lower()}"
+
+
+def make_derivatives(filename):
+    cfg = current_app.config
+    folder = cfg['UPLOAD_FOLDER']
+    names = {kind: derivative_name(filename, kind) for kind in cfg['IMAGE_DERIVATIVES']}
+    # Content-addressed sources give identical derivatives; reuse existing ones
+    missing = [kind for kind, name in names.items()
+               if not os.path.exists(os.path.join(folder, name))]
+    if not missing:
+        return names
+    with Image.open(os.path.join(folder, filename)) as img:
+        # Apply the EXIF rotation before the metadata is dropped
+        img = ImageOps.exif_transpose(img)
+        img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        for kind in missing:
+            width = cfg['IMAGE_DERIVATIVES'][kind]
+            variant = img.copy()
+            variant.thumbnail((width, width * 4), Image.LANCZOS)
+            # Written under a temp name and renamed, so the final (immutably
+            # cached) name never points at a half-written file
+            fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.derivative-')
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    # Saved without exif=..., so camera/GPS metadata is stripped
+                    variant.save(out, cfg['IMAGE_DERIVATIVE_FORMAT'],
+                                 quality=cfg['IMAGE_DERIVATIVE_QUALITY'])
+                os.replace(tmp_path, os.path.join(folder, names[kind]))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+    return names
+
+
+# ─── Metadata stripping for stored originals ───────────────────────────────
+# Originals are served publicly, so camera / GPS metadata must not survive
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+
+
+def strip_metadata(path):
+    with Image.open(path) as img:
+        if img.format not in ('JPEG', 'PNG') or not any(key in img.info for key in METADATA_KEYS):
+            return False
+        params = {}
+        # Keep only the orientation tag, so the photo still displays upright
+        orientation = img.getexif().get(ExifTags.Base.Orientation)
+        if orientation:
+            exif = Image.Exif()
+            exif[ExifTags.Base.Orientation] = orientation
+            params['exif'] = exif.tobytes()
+        if 'icc_profile' in img.info:
+            params['icc_profile'] = img.info['icc_profile']
+        if img.format == 'JPEG':
+            # Re-use the original quantisation tables to avoid visible re-encoding loss
+            params.update(quality='keep', subsampling='keep', comment=b'')
+        tmp_path = path + '.strip'
+        try:
+            img.save(tmp_path, img.format, **params)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+    return True
+
+
+def _remove(name):
+    try:
+        os.remove(os.path.join(current_app.config['UPLOAD_FOLDER'], name))
+    except FileNotFoundError:
+        pass
+
+
+def _current_hoarding(hoarding_id, filename):
+    h = db.session.get(Hoarding, hoarding_id)
+    # The image may have been replaced or the hoarding deleted meanwhile
+    return h if h is not None and h.image_filename == filename else None
+
+
+def apply_derivatives(hoarding_id, filename):
+    current = _current_hoarding(hoarding_id, filename)
+    db.session.rollback()
+    if current is None:
+        return
+    # Decode / encode outside any transaction; the write lock is only held
+    # for the re-check and the update below
+    names = make_derivatives(filename)
+    use_immediate_transactions()
+    h = _current_hoarding(hoarding_id, filename)
+    if h is None:
+        # release() ran meanwhile; drop what was built unless the image is back
+        if not os.path.exists(os.path.join(current_app.config['UPLOAD_FOLDER'], filename)):
+            for name in names.values():
+                _remove(name)
+        db.session.rollback()
+        return
+    h.thumb_filename = names.get('thumb')
+    h.preview_filename = names.get('preview')
+    db.session.commit()
+
+
+def _run(app, hoarding_id, filename):
+    with app.app_context():
+        try:
+            apply_derivatives(hoarding_id, filename)
+        except Exception:
+            db.session.rollback()
+            log.exception("Could not build derivatives for %s", filename)
+
+
+# ✅ Queue derivative generation off the request thread
+def submit_derivatives(hoarding_id, filename):
+    app = current_app._get_current_object()
+    return _get_executor(app).submit(_run, app, hoarding_id, filename)
+
+
+def wait_for_derivatives():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
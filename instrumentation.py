@@ -0,0 +1,147 @@
+import re
+import json
+import time
+import logging
+from collections import Counter
+
+from flask import g, request, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+
+from models import db
+
+log = logging.getLogger('hoardings.perf')
+
+_WHITESPACE = re.compile(r'\s+')
+_PARAM_LIST = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+MAX_LOGGED_SQL = 500
+
+
+# Statements that differ only in bound values / IN-list length share a shape
+def statement_shape(statement):
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _PARAM_LIST.sub('(?)', shape)
+    return _NUMBER.sub('N', shape)
+
+
+def _stats():
+    if not has_request_context():
+        return None
+    return g.get('_perf')
+
+
+# ─── SQLAlchemy engine events ──────────────────────────────────────────────
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('_perf_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['_perf_start'].pop()
+    stats = _stats()
+    if stats is None:
+        return
+    elapsed = (time.perf_counter() - started) * 1000
+    stats['queries'] += 1
+    stats['db_ms'] += elapsed
+    stats['shapes'][statement_shape(statement)] += 1
+    stats['statements'].append((elapsed, statement))
+
+
+def _handle_error(context):
+    # after_cursor_execute does not fire for failed statements
+    if context.connection is not None and context.connection.info.get('_perf_start'):
+        context.connection.info['_perf_start'].pop()
+
+
+# ─── Template signals ──────────────────────────────────────────────────────
+def _before_render(sender, template, context, **extra):
+    stats = _stats()
+    if stats is not None:
+        stats['render_started'].append(time.perf_counter())
+
+
+def _after_render(sender, template, context, **extra):
+    stats = _stats()
+    if stats is not None and stats['render_started']:
+        stats['render_ms'] += (time.perf_counter() - stats['render_started'].pop()) * 1000
+
+
+# ─── Request lifecycle ─────────────────────────────────────────────────────
+def _start_request():
+    g._perf = {
+        'started': time.perf_counter(),
+        'queries': 0,
+        'db_ms': 0.0,
+        'render_ms': 0.0,
+        'render_started': [],
+        'shapes': Counter(),
+        'statements': [],
+    }
+
+
+def summarize(stats, cfg):
+    slowest = sorted(stats['statements'], key=lambda s: s[0], reverse=True)
+    return {
+        'queries': stats['queries'],
+        'db_ms': round(stats['db_ms'], 2),
+        'render_ms': round(stats['render_ms'], 2),
+        # Shapes, not raw SQL: one long IN (...) list would flood the log
+        'slowest': [{'ms': round(ms, 2), 'sql': statement_shape(sql)[:MAX_LOGGED_SQL]}
+                    for ms, sql in slowest[:cfg['PERF_SLOWEST_STATEMENTS']]],
+        'n_plus_one': [{'count': count, 'sql': shape[:MAX_LOGGED_SQL]}
+                       for shape, count in stats['shapes'].most_common()
+                       if count >= cfg['PERF_N_PLUS_ONE_THRESHOLD']],
+    }
+
+
+def _report(stats, details, app):
+    total_ms = (time.perf_counter() - stats['started']) * 1000
+    summary = summarize(stats, app.config)
+    if total_ms >= app.config['PERF_SLOW_REQUEST_MS'] or summary['n_plus_one']:
+        log.warning(json.dumps({
+            'event': 'slow_request' if total_ms >= app.config['PERF_SLOW_REQUEST_MS'] else 'n_plus_one',
+            **details,
+            'total_ms': round(total_ms, 2),
+            **summary,
+        }))
+    return summary, total_ms
+
+
+def _finish_request(response, app):
+    stats = g.get('_perf')
+    if stats is None:
+        return response
+    details = {
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'endpoint': request.endpoint,
+        'status': response.status_code,
+    }
+    if response.is_streamed:
+        # The body (and its batch queries) runs after this hook; report once
+        # it has been sent. Headers are gone by then, so no Server-Timing.
+        response.call_on_close(lambda: _report(stats, details, app))
+        return response
+
+    g.pop('_perf')
+    summary, total_ms = _report(stats, details, app)
+    response.headers.add('Server-Timing',
+                         f'db;dur={summary["db_ms"]};desc="{summary["queries"]} queries", '
+                         f'tpl;dur={summary["render_ms"]}, '
+                         f'total;dur={total_ms:.2f}')
+    return response
+
+
+# ✅ Opt-in per-request query / render timing (PERF_INSTRUMENTATION)
+def init_instrumentation(app):
+    if not app.config['PERF_INSTRUMENTATION']:
+        return
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.before_request(_start_request)
+    app.after_request(lambda response: _finish_request(response, app))
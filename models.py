@@ -9,20 +9,48 @@ class User(UserMixin, db.Model):
     password = db.Column(db.String(256), nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
 
+class DataVersion(db.Model):
+    __tablename__ = 'data_version'
+    id      = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
 class Hoarding(db.Model):
     id                = db.Column(db.Integer, primary_key=True)
     size              = db.Column(db.String(50))
-    renewal_date      = db.Column(db.Date)
+    renewal_date      = db.Column(db.Date, index=True)
     amount            = db.Column(db.Float)
-    place             = db.Column(db.String(100))
+    place             = db.Column(db.String(100), index=True)
     owner_name        = db.Column(db.String(100))
     contact           = db.Column(db.String(20))
     address           = db.Column(db.String(200))
     location_url      = db.Column(db.String(300))
-    showroom_name     = db.Column(db.String(100))
+    latitude          = db.Column(db.Float)
+    longitude         = db.Column(db.Float)
+    showroom_name     = db.Column(db.String(100), index=True)
     showroom_location = db.Column(db.String(100))
-    image_filename    = db.Column(db.String(300))
+    image_filename    = db.Column(db.String(300), index=True)
+    thumb_filename    = db.Column(db.String(300))
+    preview_filename  = db.Column(db.String(300))
     created_by        = db.Column(db.Integer, db.ForeignKey('user.id'))
 
     user = db.relationship('User', backref='hoardings')
 
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'size': self.size,
+            'renewal_date': self.renewal_date.isoformat() if self.renewal_date else None,
+            'amount': self.amount,
+            'place': self.place,
+            'owner_name': self.owner_name,
+            'contact': self.contact,
+            'address': self.address,
+            'location_url': self.location_url,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'showroom_name': self.showroom_name,
+            'showroom_location': self.showroom_location,
+            'image_filename': self.image_filename,
+            'created_by': self.user.email if self.user else None,
+        }
@@ -0,0 +1,111 @@
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import joinedload
+
+from models import db, Hoarding
+
+# ─── FTS5 index over the text columns of Hoarding ──────────────────────────
+# A standalone FTS5 table keyed by hoarding.id, kept in sync by triggers so
+# every writer (ORM, bulk import, raw SQL) updates it. contact_digits holds
+# the phone number with separators removed so '98765 43210' and
+# '9876543210' find the same row.
+FTS_TABLE = 'hoarding_fts'
+FTS_COLUMNS = ('owner_name', 'contact', 'contact_digits', 'address', 'place',
+               'showroom_name', 'showroom_location', 'size')
+# bm25 weights, in FTS_COLUMNS order
+FTS_WEIGHTS = (5.0, 5.0, 5.0, 2.0, 3.0, 1.0, 1.0, 0.5)
+
+
+def _digits_sql(column):
+    expr = column
+    for ch in (' ', '-', '+', '(', ')', '.', '/'):
+        expr = f"replace({expr}, '{ch}', '')"
+    return expr
+
+
+def _values_sql(prefix):
+    values = []
+    for name in FTS_COLUMNS:
+        if name == 'contact_digits':
+            # Also index the last ten digits, so numbers stored with a +91 / 0
+            # prefix are found by the bare mobile number
+            digits = _digits_sql(f'{prefix}.contact')
+            values.append(f"{digits} || ' ' || substr({digits}, -10)")
+        else:
+            values.append(f'{prefix}.{name}')
+    return ', '.join(values)
+
+
+_COLUMNS_SQL = ', '.join(FTS_COLUMNS)
+
+SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        {_COLUMNS_SQL}, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')""",
+    f"""CREATE TRIGGER IF NOT EXISTS hoarding_fts_ai AFTER INSERT ON hoarding BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS_SQL}) VALUES (new.id, {_values_sql('new')});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS hoarding_fts_ad AFTER DELETE ON hoarding BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS hoarding_fts_au AFTER UPDATE ON hoarding BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS_SQL}) VALUES (new.id, {_values_sql('new')});
+    END""",
+]
+
+
+def create_search_index(engine):
+    if engine.dialect.name != 'sqlite':
+        return False
+    with engine.begin() as conn:
+        for statement in SCHEMA:
+            conn.exec_driver_sql(statement)
+    return True
+
+
+def rebuild_search_index():
+    db.session.execute(text(f'DELETE FROM {FTS_TABLE}'))
+    db.session.execute(text(
+        f'INSERT INTO {FTS_TABLE}(rowid, {_COLUMNS_SQL}) '
+        f'SELECT h.id, {_values_sql("h")} FROM hoarding AS h'))
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+    db.session.commit()
+    return db.session.execute(text(f'SELECT count(*) FROM {FTS_TABLE}')).scalar()
+
+
+# ─── Querying ──────────────────────────────────────────────────────────────
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+_PHONE_CHARS = re.compile(r'^[\d\s+\-().]+$')
+
+
+# ✅ Turn free text into a prefix-matching FTS5 expression
+def build_match(query):
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    match = ' AND '.join(f'"{t}"*' for t in tokens)
+    digits = re.sub(r'\D', '', query)
+    if _PHONE_CHARS.match(query) and len(digits) >= 3:
+        alternatives = [f'({match})', f'contact_digits : "{digits}"*']
+        if len(digits) > 10:
+            # "+91 98765 43210" must also find numbers stored without the prefix
+            alternatives.append(f'contact_digits : "{digits[-10:]}"*')
+        match = ' OR '.join(alternatives)
+    return match
+
+
+def search_hoardings(query, limit=50):
+    match = build_match(query)
+    if match is None:
+        return []
+    weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+    ids = db.session.execute(text(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match '
+        f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT :limit'),
+        {'match': match, 'limit': limit}).scalars().all()
+    if not ids:
+        return []
+    rows = Hoarding.query.options(joinedload(Hoarding.user)).filter(Hoarding.id.in_(ids)).all()
+    by_id = {h.id: h for h in rows}
+    return [by_id[i] for i in ids if i in by_id]
@@ -0,0 +1,95 @@
+import math
+import random
+from datetime import date, timedelta
+
+from flask import current_app
+from sqlalchemy import insert
+from werkzeug.security import generate_password_hash
+
+from models import db, User, Hoarding
+from forms import HoardingForm
+from database import use_immediate_transactions
+
+# ─── Synthetic, reproducible demo data ─────────────────────────────────────
+SHOWROOM_NAMES = [value for value, _label in HoardingForm.showroom_name.kwargs['choices']]
+SHOWROOM_LOCATIONS = [value for value, _label in HoardingForm.showroom_location.kwargs['choices']]
+
+# Most sites belong to the bigger showrooms; skew the draw accordingly
+SHOWROOM_WEIGHTS = [5, 3, 2]
+LOCATION_WEIGHTS = [8, 3, 6, 4, 3, 4, 3, 3, 2]
+
+SIZES = [('10x20', 1.0), ('20x10', 1.0), ('20x20', 1.6), ('30x15', 1.9), ('40x20', 3.0), ('60x20', 4.2)]
+SIZE_WEIGHTS = [30, 20, 20, 15, 10, 5]
+
+FIRST_NAMES = ['Anil', 'Biju', 'Deepa', 'Gopan', 'Jayan', 'Lekha', 'Manoj', 'Nisha', 'Prakash',
+               'Radhika', 'Rajesh', 'Sajan', 'Shibu', 'Sindhu', 'Suresh', 'Vinod', 'Ashraf', 'Thomas']
+LAST_NAMES = ['Nair', 'Pillai', 'Kumar', 'Menon', 'Varghese', 'Joseph', 'Thampi', 'Kurup',
+              'Das', 'Rahman', 'Mathew', 'Panicker']
+ROADS = ['MC Road', 'NH 66', 'Main Road', 'Temple Road', 'Market Junction', 'Bus Stand Road',
+         'Hospital Junction', 'Railway Station Road', 'School Road', 'Bypass']
+SUFFIXES = ['', ' Junction', ' North', ' South', ' East', ' West', ' Market']
+
+KM_PER_DEG = 111.32
+
+
+def _point_near(rng, lat, lng, spread_km):
+    # Gaussian scatter: most sites close to the showroom, a long tail further out
+    dlat = rng.gauss(0, spread_km) / KM_PER_DEG
+    dlng = rng.gauss(0, spread_km) / (KM_PER_DEG * math.cos(math.radians(lat)))
+    return round(lat + dlat, 6), round(lng + dlng, 6)
+
+
+def hoarding_rows(rng, count, user_ids, today=None):
+    today = today or date.today()
+    coordinates = current_app.config['SHOWROOM_COORDINATES']
+    for _ in range(count):
+        location = rng.choices(SHOWROOM_LOCATIONS, LOCATION_WEIGHTS)[0]
+        size, factor = rng.choices(SIZES, SIZE_WEIGHTS)[0]
+        lat, lng = _point_near(rng, *coordinates[location], spread_km=6)
+        place = location + rng.choice(SUFFIXES) if rng.random() < 0.6 else \
+            f"{rng.choice(LAST_NAMES)}{rng.choice(['kavu', 'puram', 'kara', 'kulam'])}"
+        yield {
+            'size': size,
+            # A few overdue, most spread across the coming year
+            'renewal_date': today + timedelta(days=rng.randint(-60, 365)),
+            'amount': round(rng.lognormvariate(math.log(12000 * factor), 0.35), -2),
+            'place': place,
+            'owner_name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            'contact': f"{rng.choice('6789')}{rng.randint(0, 999999999):09d}",
+            'address': f"{rng.randint(1, 400)}/{rng.randint(1, 60)}, {rng.choice(ROADS)}, {place}",
+            'location_url': f"https://www.google.com/maps?q={lat},{lng}",
+            'latitude': lat,
+            'longitude': lng,
+            'showroom_name': rng.choices(SHOWROOM_NAMES, SHOWROOM_WEIGHTS)[0],
+            'showroom_location': location,
+            'created_by': rng.choice(user_ids),
+        }
+
+
+# ✅ Seed users and hoardings; the same seed always yields the same data
+def seed_database(users, hoardings, seed=42, password='password', batch_size=5000):
+    rng = random.Random(seed)
+    # One hash for everyone: hashing per user would dominate large seeds
+    password_hash = generate_password_hash(password)
+    use_immediate_transactions()
+    db.session.add(User(email='admin@example.com', password=password_hash, is_admin=True))
+    for i in range(1, users):
+        db.session.add(User(email=f'staff{i}@example.com', password=password_hash, is_admin=False))
+    db.session.commit()
+    user_ids = [uid for (uid,) in db.session.query(User.id)]
+
+    batch = []
+    for row in hoarding_rows(rng, hoardings, user_ids):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            _insert(batch)
+    if batch:
+        _insert(batch)
+
+
+def _insert(batch):
+    # ORM bulk insert: no per-object events, so latitude/longitude come pre-filled
+    use_immediate_transactions()
+    db.session.execute(insert(Hoarding), batch)
+    db.session.commit()
+    batch.clear()
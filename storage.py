@@ -0,0 +1,139 @@
+import os
+import re
+import hashlib
+import tempfile
+from collections import namedtuple
+
+from flask import current_app
+from PIL import Image
+
+from models import db, Hoarding
+from images import derivative_name, strip_metadata
+from database import use_immediate_transactions
+
+CHUNK_SIZE = 64 * 1024
+# Originals are '<sha256>.<ext>'; derivatives are '<sha256>.<kind>.<fmt>'
+HASHED_NAME = re.compile(r'^[0-9a-f]{64}(\.[a-z0-9]+)+$')
+
+
+def is_content_addressed(filename):
+    return bool(HASHED_NAME.match(filename))
+
+
+def _extension(filename):
+    return filename.rsplit('.', 1)[1].lower()
+
+
+def _hash_file(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _strip(path):
+    # Undecodable files carry no metadata Pillow could read; store them as-is
+    try:
+        return strip_metadata(path)
+    except (OSError, Image.DecompressionBombError):
+        return False
+
+
+# A hashed upload still in its temp file, not yet visible under its final name
+StagedUpload = namedtuple('StagedUpload', 'filename tmp_path')
+
+
+# ✅ Stream an upload to a temp file, hashing its content in chunks
+def stage_upload(file_storage):
+    folder = current_app.config['UPLOAD_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    sha = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for chunk in iter(lambda: file_storage.stream.read(CHUNK_SIZE), b''):
+                sha.update(chunk)
+                out.write(chunk)
+        # Hash what is actually stored, so re-uploads of the same photo still dedupe
+        digest = _hash_file(tmp_path) if _strip(tmp_path) else sha.hexdigest()
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return StagedUpload(f"{digest}.{_extension(file_storage.filename)}", tmp_path)
+
+
+# ✅ Put a staged upload under its content-addressed name
+# Call under the write lock, before commit: a concurrent release() may have
+# just deleted an identical file, so it is re-created from the temp copy.
+def store_upload(upload):
+    target = os.path.join(current_app.config['UPLOAD_FOLDER'], upload.filename)
+    if os.path.exists(target):
+        os.remove(upload.tmp_path)
+    else:
+        os.replace(upload.tmp_path, target)
+    return upload.filename
+
+
+def discard_upload(upload):
+    if upload is None:
+        return
+    try:
+        os.remove(upload.tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+# ✅ Stage an already-stored file for its content-addressed name
+def stage_file(filename):
+    path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+    _strip(path)
+    return StagedUpload(f"{_hash_file(path)}.{_extension(filename)}", path)
+
+
+def reference_count(filename):
+    return Hoarding.query.filter_by(image_filename=filename).count()
+
+
+def remove_file(filename):
+    folder = current_app.config['UPLOAD_FOLDER']
+    names = [filename] + [derivative_name(filename, kind)
+                          for kind in current_app.config['IMAGE_DERIVATIVES']]
+    for name in names:
+        try:
+            os.remove(os.path.join(folder, name))
+        except FileNotFoundError:
+            pass
+
+
+# ✅ Delete an image (and its derivatives) once no hoarding refers to it
+# Call under the write lock, after flushing the change that dropped the
+# reference and before commit, so it cannot race a store_upload().
+def release(filename):
+    if filename and reference_count(filename) == 0:
+        remove_file(filename)
+        return True
+    return False
+
+
+# ✅ Rename legacy uploads to content hashes, merging duplicates
+def migrate_legacy_uploads():
+    folder = current_app.config['UPLOAD_FOLDER']
+    legacy = [name for (name,) in db.session.query(Hoarding.image_filename)
+              .filter(Hoarding.image_filename.isnot(None)).distinct()
+              if not is_content_addressed(name)]
+    migrated, missing = {}, []
+    for old in legacy:
+        if not os.path.exists(os.path.join(folder, old)):
+            missing.append(old)
+            continue
+        upload = stage_file(old)
+        use_immediate_transactions()
+        Hoarding.query.filter_by(image_filename=old).update(
+            {'image_filename': upload.filename, 'thumb_filename': None, 'preview_filename': None},
+            synchronize_session=False)
+        new = store_upload(upload)
+        db.session.commit()
+        remove_file(old)
+        migrated[old] = new
+    return migrated, missing